@@ -0,0 +1,18 @@
+# gunicorn_conf.py
+
+"""
+Gunicorn settings.
+The simulator state lives in one in-process SimulationController,
+so it must be served by a single worker process. That worker uses a
+few threads so open /api/stream connections don't block other requests.
+Every open stream holds one thread (for up to app.STREAM_MAX_SECONDS), so
+`threads` must exceed the number of browser tabs expected at once;
+set SIM_THREADS to raise it.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = 1
+threads = int(os.environ.get("SIM_THREADS", 8))
+worker_class = "gthread"
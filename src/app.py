@@ -9,8 +9,13 @@ Frontend (HTML/CSS/JS) will communicate with this server to:
 - Manage semaphores & monitors
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import HTTPException
+import orjson
 import os
+import time
+import zlib
 
 from src.simulator.controller import SimulationController
 
@@ -18,11 +23,65 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATES_DIR = os.path.join(BASE_DIR, "..", "templates")
 STATIC_DIR = os.path.join(BASE_DIR, "..", "static")
 
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Parse request bodies with orjson instead of the stdlib json module."""
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__, static_folder=STATIC_DIR, template_folder=TEMPLATES_DIR)
+app.json = OrjsonProvider(app)
+
+# Shared read-only default for requests without a JSON body
+_EMPTY: dict = {}
+
+
+def _json_body():
+    """Parsed JSON body; _EMPTY (no parse) when the body is empty.
+    A body that fails to parse still gets Flask's 400."""
+    if not request.get_data(cache=True):
+        return _EMPTY
+    return request.get_json() or _EMPTY
+
+def fastjson(obj):
+    """JSON response encoded with orjson (much faster than jsonify)."""
+    return Response(orjson.dumps(obj), mimetype="application/json")
+
+
+# Last snapshot dict, its encoded body and ETag. The controller hands back the
+# same dict until state changes, so identity means the bytes are still valid.
+_state_body = (None, b"", "")
+
+
+def _encode_state(snap):
+    """Return (body, etag) for a snapshot, encoding it only once."""
+    global _state_body
+    cached, body, etag = _state_body
+    if cached is not snap:
+        body = orjson.dumps(snap)
+        # Content-derived: state can change without a tick (e.g. add_thread
+        # while paused), and it stays valid across server restarts.
+        etag = f'W/"{zlib.crc32(body):08x}"'
+        _state_body = (snap, body, etag)
+    return body, etag
+
 
 # single controller instance
 controller = SimulationController(num_kernel_threads=2)
 
+_MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+@app.before_request
+def refuse_writes_during_reset():
+    """Fail fast instead of queueing writes behind an in-progress reset."""
+    if request.method in _MUTATING_METHODS and controller.in_reset:
+        return fastjson({"ok": False, "error": "simulator is resetting"}), 503
+
+
 def init_demo_state():
     """
     Reset the simulator and create some default demo threads + a semaphore,
@@ -50,57 +109,123 @@ def init_demo_state():
 # Basic state endpoint
 @app.route("/api/state", methods=["GET"])
 def api_state():
-    return jsonify(controller.get_state_snapshot())
+    body, etag = _encode_state(controller.get_state_snapshot())
+    # no-cache: clients may store it but must revalidate (cheap 304s)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype="application/json", headers=headers)
+
+
+# Each open stream occupies a server thread; end it after this long and let
+# the client reconnect so abandoned tabs don't hold threads forever.
+STREAM_MAX_SECONDS = 300
+
+
+@app.route("/api/stream", methods=["GET"])
+def api_stream():
+    """
+    Server-Sent Events: push a snapshot after every tick or state change
+    (and at least every 5s so idle connections stay alive).
+    Ends with a "reconnect" event after STREAM_MAX_SECONDS.
+    """
+    def stream():
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            # Read the counter first: anything after it is newer than what we send
+            seen = controller.update_seq
+            yield b"data: " + _encode_state(controller.get_state_snapshot())[0] + b"\n\n"
+            controller.wait_for_update(seen, timeout=5)
+        yield b"event: reconnect\ndata: \n\n"
+
+    return Response(stream(), mimetype="text/event-stream")
+
+
+# Routes that must never run inside a batch
+_BATCH_EXCLUDED = {"/api/batch", "/api/stream"}
+
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """
+    Run several GET API routes in one request:
+        {"routes": ["/api/state", ...]} -> {"ok": true, "results": {path: json}}
+    All routes are dispatched under a single controller lock acquisition.
+    """
+    data = _json_body()
+    routes = data.get("routes")
+    # Paths become keys of the result object, so they must be strings
+    if not isinstance(routes, list) or not all(isinstance(p, str) for p in routes):
+        return fastjson({"ok": False, "error": "routes must be a list of strings"}), 400
+
+    adapter = app.url_map.bind("")
+    results = {}
+    with controller.locked():
+        for path in routes:
+            if not path.startswith("/api/") or path in _BATCH_EXCLUDED:
+                results[path] = {"ok": False, "error": "route not allowed in batch"}
+                continue
+            try:
+                endpoint, args = adapter.match(path, method="GET")
+            except HTTPException as e:
+                results[path] = {"ok": False, "error": e.name}
+                continue
+            # Own request context: sub-views must not see the batch request's
+            # headers (e.g. If-None-Match would turn /api/state into a 304)
+            with app.test_request_context(path, method="GET"):
+                resp = app.make_response(app.view_functions[endpoint](**args))
+            results[path] = orjson.loads(resp.get_data())
+    return fastjson({"ok": True, "results": results})
 
 
 # Control endpoints
 @app.route("/api/start", methods=["POST"])
 def api_start():
     controller.start()
-    return jsonify({"ok": True})
+    return fastjson({"ok": True})
 
 
 @app.route("/api/pause", methods=["POST"])
 def api_pause():
     controller.pause()
-    return jsonify({"ok": True})
+    return fastjson({"ok": True})
 
 
 @app.route("/api/step", methods=["POST"])
 def api_step():
     controller.step()
-    return jsonify({"ok": True})
+    return fastjson({"ok": True})
 
 
 @app.route("/api/reset", methods=["POST"])
 def api_reset():
     controller.reset()
-    return jsonify({"ok": True})
+    return fastjson({"ok": True})
 
 
 @app.route("/api/add_thread", methods=["POST"])
 def api_add_thread():
-    data = request.json or {}
-    burst = int(data.get("burst", 10))
-    pr = int(data.get("priority", 0))
+    data = _json_body()
+    burst = int(data["burst"]) if "burst" in data else 10
+    pr = int(data["priority"]) if "priority" in data else 0
     name = data.get("name")
     t = controller.add_thread(total_burst=burst, priority=pr, name=name)
-    return jsonify({"ok": True, "thread": {"id": t.id, "name": t.name}})
+    return fastjson({"ok": True, "thread": {"id": t.id, "name": t.name}})
 
 
 @app.route("/api/set", methods=["POST"])
 def api_set():
-    data = request.json or {}
+    data = _json_body()
     if "model" in data:
         try:
             controller.set_model(data["model"])
         except Exception as e:
-            return jsonify({"ok": False, "error": str(e)}), 400
+            return fastjson({"ok": False, "error": str(e)}), 400
     if "scheduler" in data:
         controller.set_scheduler(data["scheduler"])
     if "quantum" in data:
-        controller.set_quantum(int(data["quantum"]))
-    return jsonify({"ok": True})
+        controller.set_quantum(data["quantum"])
+    return fastjson({"ok": True})
 
 @app.route("/api/init_demo", methods=["POST"])
 def api_init_demo():
@@ -111,7 +236,7 @@ def api_init_demo():
     - Start simulation
     """
     init_demo_state()
-    return jsonify({"ok": True})
+    return fastjson({"ok": True})
 
 
 # -----------------------------
@@ -119,34 +244,34 @@ def api_init_demo():
 # -----------------------------
 @app.route("/api/semaphore/create", methods=["POST"])
 def api_sem_create():
-    data = request.json or {}
+    data = _json_body()
     name = data.get("name")
-    initial = int(data.get("initial", 1))
+    initial = int(data["initial"]) if "initial" in data else 1
     if not name:
-        return jsonify({"ok": False, "error": "name required"}), 400
+        return fastjson({"ok": False, "error": "name required"}), 400
     s = controller.create_semaphore(name, initial)
-    return jsonify({"ok": True, "semaphore": {"name": s.name, "value": s.value}})
+    return fastjson({"ok": True, "semaphore": {"name": s.name, "value": s.value}})
 
 
 @app.route("/api/semaphore/wait", methods=["POST"])
 def api_sem_wait():
-    data = request.json or {}
+    data = _json_body()
     name = data.get("name")
     tid = data.get("thread_id")
     if not name or tid is None:
-        return jsonify({"ok": False, "error": "name and thread_id required"}), 400
+        return fastjson({"ok": False, "error": "name and thread_id required"}), 400
     result = controller.semaphore_wait(name, tid)
-    return jsonify(result)
+    return fastjson(result)
 
 
 @app.route("/api/semaphore/signal", methods=["POST"])
 def api_sem_signal():
-    data = request.json or {}
+    data = _json_body()
     name = data.get("name")
     if not name:
-        return jsonify({"ok": False, "error": "name required"}), 400
+        return fastjson({"ok": False, "error": "name required"}), 400
     result = controller.semaphore_signal(name)
-    return jsonify(result)
+    return fastjson(result)
 
 
 # -----------------------------
@@ -154,35 +279,35 @@ def api_sem_signal():
 # -----------------------------
 @app.route("/api/monitor/create", methods=["POST"])
 def api_mon_create():
-    data = request.json or {}
+    data = _json_body()
     name = data.get("name")
     if not name:
-        return jsonify({"ok": False, "error": "name required"}), 400
+        return fastjson({"ok": False, "error": "name required"}), 400
     m = controller.create_monitor(name)
-    return jsonify({"ok": True})
+    return fastjson({"ok": True})
 
 
 @app.route("/api/monitor/wait", methods=["POST"])
 def api_mon_wait():
-    data = request.json or {}
+    data = _json_body()
     name = data.get("name")
     cond = data.get("cond", "default")
     tid = data.get("thread_id")
     if not name or tid is None:
-        return jsonify({"ok": False, "error": "name and thread_id required"}), 400
+        return fastjson({"ok": False, "error": "name and thread_id required"}), 400
     result = controller.monitor_wait(name, cond, tid)
-    return jsonify(result)
+    return fastjson(result)
 
 
 @app.route("/api/monitor/signal", methods=["POST"])
 def api_mon_signal():
-    data = request.json or {}
+    data = _json_body()
     name = data.get("name")
     cond = data.get("cond", "default")
     if not name:
-        return jsonify({"ok": False, "error": "name required"}), 400
+        return fastjson({"ok": False, "error": "name required"}), 400
     result = controller.monitor_signal(name, cond)
-    return jsonify(result)
+    return fastjson(result)
 
 
 # Serve frontend entry
@@ -197,5 +322,11 @@ def serve_static(path):
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)), debug=True)
+    # Threaded so an open /api/stream connection doesn't block other requests;
+    # the controller's own locks serialize access to simulator state.
+    # Debugger is opt-in (FLASK_DEBUG=1); the reloader stays off because it
+    # would start a second process with its own controller.
+    debug = os.environ.get("FLASK_DEBUG", "0") == "1"
+    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)),
+            debug=debug, use_reloader=False, threaded=True)
 
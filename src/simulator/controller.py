@@ -6,24 +6,48 @@ SimulationController:
 - Provides functions used by the Flask API (including semaphore & monitor ops)
 """
 
+import itertools
+import queue
 import threading
 import time
-from typing import Dict, List, Optional
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
 
 from .core import (
     SimThread,
     KernelThread,
-    ThreadState,
+    READY,
+    RUNNING,
+    BLOCKED,
+    TERMINATED,
+    STATE_NAMES,
     RoundRobinScheduler,
     FCFSScheduler,
     PriorityScheduler,
+    ShardedRRScheduler,
     MappingModel,
+    NOT_RUNNABLE,
 )
 from .sync import SimSemaphore, Monitor
 
 # Default tick interval (seconds)
 TICK_INTERVAL = 1
 
+# Bits of threads that can use a core (see core.NOT_RUNNABLE)
+_ACTIVE = READY | RUNNING
+
+# Scheduler name (upper-cased) -> scheduler class
+_SCHEDULERS = {
+    "RR": RoundRobinScheduler,
+    "ROUNDROBIN": RoundRobinScheduler,
+    "FCFS": FCFSScheduler,
+    "FIFO": FCFSScheduler,
+    "PRIORITY": PriorityScheduler,
+    "PR": PriorityScheduler,
+    "SHARDED": ShardedRRScheduler,
+    "RR_SHARDED": ShardedRRScheduler,
+}
+
 
 class SimulationController:
     """
@@ -35,43 +59,141 @@ class SimulationController:
                  scheduler_name: str = "RR",
                  quantum: int = 1):
 
-        self.lock = threading.RLock()
+        # Fine-grained locks, one per subsystem. When more than one is needed
+        # they are always taken in this order to avoid deadlock:
+        #   _threads_lock -> _sem_lock -> _mon_lock -> _sched_lock -> _stats_lock
+        # _sched_lock also guards the kernels and the run/config fields.
+        self._threads_lock = threading.RLock()
+        self._sem_lock = threading.RLock()
+        self._mon_lock = threading.RLock()
+        self._sched_lock = threading.RLock()
+        self._stats_lock = threading.RLock()
 
         # Thread table: id -> SimThread
         self.threads: Dict[int, SimThread] = {}
+        # Thread ids in creation order (ids are monotonic, so this stays sorted)
+        self._thread_order: List[int] = []
 
         # Kernel threads / cores
         self.kernels: List[KernelThread] = [KernelThread(i) for i in range(num_kernel_threads)]
+        # Reverse index: thread id -> kernels it is bound to (under _sched_lock).
+        # A set, because FCFS hands the same head thread to every idle core.
+        self._thread_to_kernel: Dict[int, Set[KernelThread]] = {}
 
         # Mapping & scheduling
         self.model = model
         self.quantum = quantum
         self.scheduler = self._make_scheduler(scheduler_name)
+        # Newly runnable threads from API producers; drained by the tick
+        # (single consumer) so producers never wait on _sched_lock.
+        # Entries are (token, thread); only a thread's latest token counts,
+        # so an entry left over from before it blocked is skipped.
+        self._ready_inbox: queue.SimpleQueue = queue.SimpleQueue()
+        self._inbox_latest: Dict[int, int] = {}
+        self._inbox_tokens = itertools.count()
 
         # Simulation state
-        self.running = False
+        # Set while the background loop should keep ticking (lock-free reads)
+        self._running = threading.Event()
         self._tick = 0
         self._runner_thread: Optional[threading.Thread] = None
+        # Resets in progress (a count, so overlapping resets don't clear
+        # each other's flag); only changed under _reset_lock
+        self._resets_pending = 0
+        self._reset_lock = threading.Lock()
+        # Wakes the run loop early (pause, or a thread became runnable)
+        self._wakeup = threading.Condition()
+        # Notified after every completed tick or API mutation (used by
+        # streaming clients)
+        self._update_cv = threading.Condition()
+        # Bumped (under _update_cv) on every notification, so a waiter that
+        # was busy when one fired still sees it
+        self._update_seq = 0
 
         # Sync primitives
         self.semaphores: Dict[str, SimSemaphore] = {}
         self.monitors: Dict[str, Monitor] = {}
 
-        # Statistics
-        self.stats = {"context_switches": 0, "completed": 0}
+        # Statistics (plain counters, only bumped under _stats_lock)
+        self._cs_count = 0
+        self._done_count = 0
+
+        # Published snapshot. Readers take the reference without locking;
+        # it is replaced wholesale (never mutated) after each tick, or lazily
+        # once an API mutation marks it dirty.
+        self._snapshot_ref: Dict = {}
+        self._snapshot_dirty = True
+        # Generations: last one handed out (under locked()) and the one held
+        # by _snapshot_ref, so a slow publisher can't replace a newer snapshot.
+        self._snapshot_seq = 0
+        self._snapshot_gen = 0
+        self._publish_lock = threading.Lock()
 
     # -----------------------------
     # Internal helpers
     # -----------------------------
     def _make_scheduler(self, name: str):
-        name = (name or "RR").upper()
-        if name in ("RR", "ROUNDROBIN"):
-            return RoundRobinScheduler()
-        if name in ("FCFS", "FIFO"):
-            return FCFSScheduler()
-        if name in ("PRIORITY", "PR"):
-            return PriorityScheduler()
-        return RoundRobinScheduler()
+        cls = _SCHEDULERS.get((name or "RR").upper(), RoundRobinScheduler)
+        if cls is ShardedRRScheduler:
+            # one ready queue per core
+            return cls(len(self.kernels))
+        return cls()
+
+    @contextmanager
+    def locked(self):
+        """Hold every controller lock, acquired in the canonical order."""
+        with self._threads_lock, self._sem_lock, self._mon_lock, \
+                self._sched_lock, self._stats_lock:
+            yield
+
+    def _forget_binding(self, k: KernelThread):
+        # Caller holds _sched_lock. Drop k from its current thread's index entry.
+        cur = k.current_thread
+        if cur is None:
+            return
+        ks = self._thread_to_kernel.get(cur.id)
+        if ks is not None:
+            ks.discard(k)
+            if not ks:
+                del self._thread_to_kernel[cur.id]
+
+    def _bind(self, k: KernelThread, thread: SimThread):
+        # Caller holds _sched_lock
+        self._forget_binding(k)
+        k.assign(thread)
+        self._thread_to_kernel.setdefault(thread.id, set()).add(k)
+
+    def _unbind(self, k: KernelThread):
+        # Caller holds _sched_lock
+        self._forget_binding(k)
+        k.release()
+
+    def _unbind_thread(self, thread: SimThread):
+        # Caller holds _sched_lock. Releases every core the thread is on.
+        for k in self._thread_to_kernel.pop(thread.id, ()):
+            if k.current_thread is thread:
+                k.release()
+
+    def _has_runnable(self) -> bool:
+        return any(t.state & _ACTIVE for t in list(self.threads.values()))
+
+    def _queue_ready(self, t: SimThread):
+        # Caller holds the lock of the subsystem that made t READY
+        tok = next(self._inbox_tokens)
+        self._inbox_latest[t.id] = tok
+        self._ready_inbox.put((tok, t))
+
+    def _mark_dirty(self):
+        # Safe under any controller lock: _update_cv is never held while
+        # taking one of them.
+        self._snapshot_dirty = True
+        with self._update_cv:
+            self._update_seq += 1
+            self._update_cv.notify_all()
+
+    def _notify_runner(self):
+        with self._wakeup:
+            self._wakeup.notify()
 
     # -----------------------------
     # Configuration setters
@@ -81,38 +203,46 @@ class SimulationController:
         Change scheduler type and re-register all non-terminated, non-blocked threads
         so the new scheduler gets a proper READY queue.
         """
-        with self.lock:
+        with self._threads_lock, self._sched_lock:
             new_sched = self._make_scheduler(name)
 
             # Re-add all runnable threads to the new scheduler
             for t in self.threads.values():
-                if t.state not in (ThreadState.TERMINATED, ThreadState.BLOCKED):
+                if not t.state & NOT_RUNNABLE:
                     new_sched.add(t)
 
             self.scheduler = new_sched
+            self._mark_dirty()
 
 
     def set_model(self, model_name: str):
-        with self.lock:
+        with self._sched_lock:
             if isinstance(model_name, str):
                 self.model = MappingModel[model_name]
             elif isinstance(model_name, MappingModel):
                 self.model = model_name
+            self._mark_dirty()
 
     def set_quantum(self, q: int):
-        with self.lock:
+        with self._sched_lock:
             self.quantum = int(q)
+            self._mark_dirty()
 
     # -----------------------------
     # Thread lifecycle
     # -----------------------------
     def add_thread(self, total_burst: int = 10, priority: int = 0, name: str = None) -> SimThread:
-        with self.lock:
+        with self._threads_lock:
             t = SimThread(total_burst=total_burst, priority=priority, name=name)
-            t.state = ThreadState.READY
+            t.state = READY
             self.threads[t.id] = t
-            self.scheduler.add(t)
-            return t
+            self._thread_order.append(t.id)
+            self._mark_dirty()
+            # Still under _threads_lock, so a concurrent reset() can't swap
+            # the inbox between registering the thread and queueing it.
+            self._queue_ready(t)
+        self._notify_runner()
+        return t
 
     def get_thread(self, tid: int) -> Optional[SimThread]:
         return self.threads.get(int(tid))
@@ -121,18 +251,20 @@ class SimulationController:
     # Semaphore & Monitor management
     # -----------------------------
     def create_semaphore(self, name: str, initial: int = 1) -> SimSemaphore:
-        with self.lock:
+        with self._sem_lock:
             s = SimSemaphore(initial, name=name)
             self.semaphores[name] = s
+            self._mark_dirty()
             return s
 
     def get_semaphore(self, name: str) -> Optional[SimSemaphore]:
         return self.semaphores.get(name)
 
     def create_monitor(self, name: str) -> Monitor:
-        with self.lock:
+        with self._mon_lock:
             m = Monitor()
             self.monitors[name] = m
+            self._mark_dirty()
             return m
 
     def get_monitor(self, name: str) -> Optional[Monitor]:
@@ -148,26 +280,26 @@ class SimulationController:
         If the semaphore causes blocking, mark thread BLOCKED and remove from scheduler.
         Returns a dict: {"acquired": bool, "blocked": bool}
         """
-        with self.lock:
+        t = self.threads.get(int(thread_id))
+        with self._sem_lock:
             sem = self.semaphores.get(sem_name)
-            t = self.threads.get(int(thread_id))
             if sem is None:
                 return {"ok": False, "error": f"Semaphore '{sem_name}' not found."}
             if t is None:
                 return {"ok": False, "error": f"Thread id {thread_id} not found."}
 
             acquired = sem.P(t)
+            self._mark_dirty()
             if not acquired:
-                # block the thread: remove from scheduler queue, set state
-                t.state = ThreadState.BLOCKED
-                try:
-                    self.scheduler.remove(t)
-                except Exception:
-                    pass
-                # If the thread was assigned to a kernel, release it
-                for k in self.kernels:
-                    if k.current_thread is t:
-                        k.release()
+                with self._sched_lock:
+                    # block the thread: remove from scheduler queue, set state
+                    t.state = BLOCKED
+                    try:
+                        self.scheduler.remove(t)
+                    except Exception:
+                        pass
+                    # If the thread was assigned to a kernel, release it
+                    self._unbind_thread(t)
                 return {"ok": True, "acquired": False, "blocked": True}
             else:
                 return {"ok": True, "acquired": True, "blocked": False}
@@ -176,99 +308,141 @@ class SimulationController:
         """
         Perform V() on semaphore; if an unblocked thread returned by V(), set it to READY and re-add to scheduler.
         """
-        with self.lock:
+        with self._sem_lock:
             sem = self.semaphores.get(sem_name)
             if sem is None:
                 return {"ok": False, "error": f"Semaphore '{sem_name}' not found."}
             unblocked = sem.V()
+            self._mark_dirty()
             if unblocked is not None:
-                # set unblocked thread to READY and add back to scheduler
-                unblocked.state = ThreadState.READY
-                self.scheduler.add(unblocked)
-                return {"ok": True, "unblocked": unblocked.id}
+                # set unblocked thread to READY and hand it back to the scheduler
+                unblocked.state = READY
+                self._queue_ready(unblocked)
+        if unblocked is None:
             return {"ok": True, "unblocked": None}
+        self._notify_runner()
+        return {"ok": True, "unblocked": unblocked.id}
 
     # Monitor primitives (simple)
     def monitor_wait(self, monitor_name: str, cond_name: str, thread_id: int) -> Dict:
-        with self.lock:
+        t = self.threads.get(int(thread_id))
+        with self._mon_lock:
             mon = self.monitors.get(monitor_name)
-            t = self.threads.get(int(thread_id))
             if mon is None:
                 return {"ok": False, "error": f"Monitor '{monitor_name}' not found."}
             if t is None:
                 return {"ok": False, "error": f"Thread id {thread_id} not found."}
-            # caller is expected to release monitor lock; here we just enqueue
-            t.state = ThreadState.BLOCKED
-            mon.wait(cond_name, t)
-            try:
-                self.scheduler.remove(t)
-            except Exception:
-                pass
-            # release assignment if any
-            for k in self.kernels:
-                if k.current_thread is t:
-                    k.release()
+            with self._sched_lock:
+                # caller is expected to release monitor lock; here we just enqueue
+                t.state = BLOCKED
+                mon.wait(cond_name, t)
+                try:
+                    self.scheduler.remove(t)
+                except Exception:
+                    pass
+                # release assignment if any
+                self._unbind_thread(t)
+                self._mark_dirty()
             return {"ok": True, "blocked": t.id}
 
     def monitor_signal(self, monitor_name: str, cond_name: str) -> Dict:
-        with self.lock:
+        with self._mon_lock:
             mon = self.monitors.get(monitor_name)
             if mon is None:
                 return {"ok": False, "error": f"Monitor '{monitor_name}' not found."}
             th = mon.signal(cond_name)
             if th:
-                th.state = ThreadState.READY
-                self.scheduler.add(th)
-                return {"ok": True, "unblocked": th.id}
+                th.state = READY
+                self._queue_ready(th)
+                self._mark_dirty()
+        if not th:
             return {"ok": True, "unblocked": None}
+        self._notify_runner()
+        return {"ok": True, "unblocked": th.id}
 
     def monitor_broadcast(self, monitor_name: str, cond_name: str) -> Dict:
-        with self.lock:
+        with self._mon_lock:
             mon = self.monitors.get(monitor_name)
             if mon is None:
                 return {"ok": False, "error": f"Monitor '{monitor_name}' not found."}
             lst = mon.broadcast(cond_name)
             for th in lst:
-                th.state = ThreadState.READY
-                self.scheduler.add(th)
-            return {"ok": True, "unblocked": [t.id for t in lst]}
+                th.state = READY
+                self._queue_ready(th)
+            if lst:
+                self._mark_dirty()
+        if lst:
+            self._notify_runner()
+        return {"ok": True, "unblocked": [t.id for t in lst]}
 
     # -----------------------------
     # Snapshot for frontend
     # -----------------------------
     def get_state_snapshot(self) -> Dict:
-        with self.lock:
-            threads = [
-                {
-                    "id": t.id,
-                    "name": t.name,
-                    "state": t.state.value,
-                    "remaining": t.remaining,
-                    "priority": t.priority,
-                    "mapped_kernel": t.mapped_kernel,
-                }
-                for t in sorted(self.threads.values(), key=lambda x: x.id)
-            ]
-            kernels = [
-                {
-                    "id": k.id,
-                    "current_thread": k.current_thread.id if k.current_thread else None,
-                }
-                for k in self.kernels
-            ]
-            sems = {name: {"value": s.value, "blocked": [th.id for th in s.peek_blocked()]} for name, s in self.semaphores.items()}
-            mons = {name: {"conds": {}} for name in self.monitors.keys()}
-            stats = dict(self.stats)
-            return {
-                "tick": self._tick,
-                "threads": threads,
-                "kernels": kernels,
-                "semaphores": sems,
-                "monitors": mons,
-                "model": self.model.value,
-                "quantum": self.quantum,
-                "stats": stats,
+        """
+        Return the latest published snapshot (lock-free unless it is stale).
+        The returned dict is shared between callers and must not be mutated.
+        """
+        if self._snapshot_dirty:
+            self._publish_snapshot()
+        return self._snapshot_ref
+
+    def _publish_snapshot(self):
+        # Copy the raw field values under the locks (threads are mutated by
+        # the tick), format outside them so a busy tick is not held up by
+        # serialization.
+        with self.locked():
+            self._snapshot_dirty = False
+            self._snapshot_seq += 1
+            gen = self._snapshot_seq
+            thread_list = []
+            for tid in self._thread_order:
+                t = self.threads[tid]
+                thread_list.append((t.id, t.name, t.state, t.remaining, t.priority, t.mapped_kernel))
+            kernel_list = [(k.id, k.current_thread.id if k.current_thread else None)
+                           for k in self.kernels]
+            sem_list = [(name, s.value, list(s.peek_blocked_ids())) for name, s in self.semaphores.items()]
+            mon_names = list(self.monitors.keys())
+            tick = self._tick
+            model = self.model
+            quantum = self.quantum
+            stats = {"context_switches": self._cs_count, "completed": self._done_count}
+
+        threads = [
+            {
+                "id": tid,
+                "name": name,
+                "state": STATE_NAMES[state],
+                "remaining": remaining,
+                "priority": priority,
+                "mapped_kernel": mapped_kernel,
+            }
+            for tid, name, state, remaining, priority, mapped_kernel in thread_list
+        ]
+        kernels = [
+            {
+                "id": kid,
+                "current_thread": cur_id,
             }
+            for kid, cur_id in kernel_list
+        ]
+        sems = {name: {"value": value, "blocked": blocked} for name, value, blocked in sem_list}
+        mons = {name: {"conds": {}} for name in mon_names}
+        snap = {
+            "tick": tick,
+            "threads": threads,
+            "kernels": kernels,
+            "semaphores": sems,
+            "monitors": mons,
+            "model": model.value,
+            "quantum": quantum,
+            "stats": stats,
+        }
+        # Readers see the old or the new dict; only move forward in generation
+        with self._publish_lock:
+            if gen > self._snapshot_gen:
+                self._snapshot_gen = gen
+                self._snapshot_ref = snap
 
     # -----------------------------
     # Tick / Run loop
@@ -276,43 +450,67 @@ class SimulationController:
     def _assign_thread_to_kernel(self, thread: SimThread) -> KernelThread:
         if self.model == MappingModel.MANY_TO_ONE:
             k = self.kernels[0]
-            k.assign(thread)
+            self._bind(k, thread)
             return k
         elif self.model == MappingModel.ONE_TO_ONE:
             idx = (thread.id - 1) % len(self.kernels)
             k = self.kernels[idx]
-            k.assign(thread)
+            self._bind(k, thread)
             return k
         else:  # MANY_TO_MANY
             for k in self.kernels:
-                if k.current_thread is None or k.current_thread.state in (ThreadState.TERMINATED, ThreadState.BLOCKED):
-                    k.assign(thread)
+                if k.current_thread is None or k.current_thread.state & NOT_RUNNABLE:
+                    self._bind(k, thread)
                     return k
             k = self.kernels[0]
-            k.assign(thread)
+            self._bind(k, thread)
             return k
 
-    def _run_tick(self):
-            with self.lock:
-                self._tick += 1
+    def _drain_ready_inbox(self):
+        # Caller holds _sched_lock. Skip superseded entries (the thread was
+        # queued again later) and threads that were blocked again (or
+        # finished) before we got to them. _inbox_latest is only read here,
+        # so a producer's concurrent update is never lost.
+        latest = self._inbox_latest
+        while True:
+            try:
+                tok, t = self._ready_inbox.get_nowait()
+            except queue.Empty:
+                return
+            if latest.get(t.id) == tok and t.state == READY:
+                self.scheduler.add(t)
+
+    def _run_tick(self) -> bool:
+        """Advance one tick. Returns False (and does nothing) when idle."""
+        with self._sched_lock:
+            self._drain_ready_inbox()
+            # Nothing READY/RUNNING: don't burn ticks on an idle simulator,
+            # but still free cores left holding a finished/blocked thread.
+            if not self._has_runnable():
+                for k in self.kernels:
+                    cur = k.current_thread
+                    if cur is not None and cur.state & NOT_RUNNABLE:
+                        self._unbind(k)
+                        self._mark_dirty()
+                return False
+            self._tick += 1
+            self._snapshot_dirty = True
 
             for k in self.kernels:
 
                 # If kernel is empty or has a non-runnable thread, assign a new one
-                if k.current_thread is None or k.current_thread.state in (
-                    ThreadState.TERMINATED,
-                    ThreadState.BLOCKED,
-                ):
-                    nxt = self.scheduler.next()
+                if k.current_thread is None or k.current_thread.state & NOT_RUNNABLE:
+                    nxt = self.scheduler.next(k.id)
                     if nxt is None:
-                        k.release()
+                        self._unbind(k)
                         continue
-                    if nxt.state == ThreadState.TERMINATED:
+                    if nxt.state == TERMINATED:
                         continue
 
-                    self.stats["context_switches"] += 1
-                    nxt.state = ThreadState.RUNNING
-                    k.assign(nxt)
+                    with self._stats_lock:
+                        self._cs_count += 1
+                    nxt.state = RUNNING
+                    self._bind(k, nxt)
 
                 # If after this we still have no thread assigned, skip
                 if k.current_thread is None:
@@ -322,9 +520,11 @@ class SimulationController:
                 used = k.current_thread.run_slice(self.quantum)
 
                 # If the thread finished during this tick, free the core
-                if k.current_thread.state == ThreadState.TERMINATED:
-                    self.stats["completed"] += 1
-                    k.release()
+                if k.current_thread.state == TERMINATED:
+                    with self._stats_lock:
+                        self._done_count += 1
+                    # Every core it is on, not just k (FCFS shares the head)
+                    self._unbind_thread(k.current_thread)
                     # No requeue; finished is done
                     continue
 
@@ -333,45 +533,92 @@ class SimulationController:
                 # until it finishes or is blocked. This makes the core visibly busy
                 # in the frontend between ticks.
 
+        self._publish_snapshot()
+        with self._update_cv:
+            self._update_seq += 1
+            self._update_cv.notify_all()
+        return True
+
+    @property
+    def update_seq(self) -> int:
+        """Counter of ticks and state changes; pass it to wait_for_update()."""
+        return self._update_seq
 
+    def wait_for_update(self, seen: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until there has been a tick or state change since update_seq
+        was `seen`. Returns False on timeout.
+        """
+        with self._update_cv:
+            return self._update_cv.wait_for(lambda: self._update_seq != seen, timeout=timeout)
 
+    @property
+    def running(self) -> bool:
+        return self._running.is_set()
 
     def start(self):
-        with self.lock:
-            if self.running:
+        with self._sched_lock:
+            if self._running.is_set():
                 return
-            self.running = True
+            self._running.set()
             self._runner_thread = threading.Thread(target=self._run_loop, daemon=True)
             self._runner_thread.start()
 
     def _run_loop(self):
-        while True:
-            with self.lock:
-                if not self.running:
-                    break
+        while self._running.is_set():
             self._run_tick()
-            time.sleep(TICK_INTERVAL)
+            deadline = time.monotonic() + TICK_INTERVAL
+            with self._wakeup:
+                while self._running.is_set():
+                    if not self._has_runnable():
+                        # Idle: sleep until pause() or a thread becomes
+                        # runnable, then tick right away.
+                        self._wakeup.wait()
+                        break
+                    # Timed wait: notifications (API calls) must not shorten
+                    # the tick, so go back to sleep for whatever is left.
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(timeout=remaining)
 
     def pause(self):
-        with self.lock:
-            self.running = False
+        self._running.clear()
+        with self._wakeup:
+            self._wakeup.notify_all()
 
     def step(self):
-        with self.lock:
-            self._run_tick()
+        self._run_tick()
 
     # -----------------------------
     # Utility: reset (handy for demos)
     # -----------------------------
+    @property
+    def in_reset(self) -> bool:
+        return self._resets_pending > 0
+
     def reset(self):
-        with self.lock:
-            self.threads.clear()
-            for k in self.kernels:
-                k.release()
-            self.semaphores.clear()
-            self.monitors.clear()
-            self._tick = 0
-            self.stats = {"context_switches": 0, "completed": 0}
-            # also reset scheduler
-            self.scheduler = self._make_scheduler("RR")
+        # Flag first so the API can refuse writes while we wait for the locks
+        with self._reset_lock:
+            self._resets_pending += 1
+        try:
+            with self.locked():
+                self.threads.clear()
+                self._thread_order.clear()
+                for k in self.kernels:
+                    k.release()
+                self._thread_to_kernel.clear()
+                self.semaphores.clear()
+                self.monitors.clear()
+                self._tick = 0
+                self._cs_count = 0
+                self._done_count = 0
+                self._mark_dirty()
+                # also reset scheduler
+                self.scheduler = self._make_scheduler("RR")
+                self._ready_inbox = queue.SimpleQueue()
+                self._inbox_latest = {}
+        finally:
+            with self._reset_lock:
+                self._resets_pending -= 1
 
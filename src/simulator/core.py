@@ -4,27 +4,43 @@
 Core simulator classes:
 - SimThread: simulated thread
 - KernelThread: simulated CPU/core
-- Schedulers: Round Robin, FCFS, Priority
+- Schedulers: Round Robin (global or per-core sharded), FCFS, Priority
 - Mapping models: Many-to-One, One-to-One, Many-to-Many
 """
 
 import enum
+import heapq
 import itertools
-import threading
 from collections import deque
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 
 # -----------------------------
 # ENUMS & ID GENERATORS
 # -----------------------------
 
-class ThreadState(enum.Enum):
-    NEW = "NEW"
-    READY = "READY"
-    RUNNING = "RUNNING"
-    BLOCKED = "BLOCKED"
-    TERMINATED = "TERMINATED"
+class ThreadState(enum.IntFlag):
+    NEW = 1
+    READY = 2
+    RUNNING = 4
+    BLOCKED = 8
+    TERMINATED = 16
+
+
+# SimThread.state holds these plain ints (one bit per state): comparisons
+# and masks are then C-level int ops instead of Enum/IntFlag calls.
+# ThreadState is kept for names (UI, repr).
+NEW = int(ThreadState.NEW)
+READY = int(ThreadState.READY)
+RUNNING = int(ThreadState.RUNNING)
+BLOCKED = int(ThreadState.BLOCKED)
+TERMINATED = int(ThreadState.TERMINATED)
+
+# Masks: "is schedulable" / "is not" become a single AND
+SCHEDULABLE = NEW | READY | RUNNING
+NOT_RUNNABLE = BLOCKED | TERMINATED
+
+STATE_NAMES = {int(st): st.name for st in ThreadState}
 
 
 class MappingModel(enum.Enum):
@@ -33,7 +49,8 @@ class MappingModel(enum.Enum):
     MANY_TO_MANY = "MANY_TO_MANY"
 
 
-_next_thread_id = itertools.count(1)
+# Thread id source; next() on a count is atomic under the GIL
+_id_counter = itertools.count(1)
 
 
 # -----------------------------
@@ -41,41 +58,51 @@ _next_thread_id = itertools.count(1)
 # -----------------------------
 
 class SimThread:
+    """
+    Not internally locked: every run_slice() call happens inside a tick,
+    under the controller's _sched_lock, so calls never overlap (even when
+    FCFS binds this thread to several cores in the same tick). Outside
+    code only flips `state` (e.g. to BLOCKED), which run_slice's guard
+    checks first.
+    """
+
+    __slots__ = ("id", "name", "total_burst", "remaining", "priority",
+                 "state", "mapped_kernel")
+
     def __init__(self, total_burst: int = 10, priority: int = 0, name: Optional[str] = None):
-        self.id = next(_next_thread_id)
+        self.id = next(_id_counter)
         self.name = name or f"T{self.id}"
         self.total_burst = total_burst
         self.remaining = total_burst
         self.priority = priority
-        self.state = ThreadState.NEW
+        self.state = NEW
         self.mapped_kernel = None
-        self.lock = threading.Lock()
+
+    @property
+    def state_name(self) -> str:
+        return STATE_NAMES[self.state]
 
     def is_done(self):
         return self.remaining <= 0
 
     def run_slice(self, quantum=1):
-            with self.lock:
-            # if this thread is blocked or already finished, do nothing
-                if self.state in (ThreadState.BLOCKED, ThreadState.TERMINATED):
-                    return 0
-
-            to_run = min(self.remaining, quantum)
-            self.remaining -= to_run
-
-            if self.remaining <= 0:
-                # finished this tick
-                self.state = ThreadState.TERMINATED
-            else:
-                # keep it in RUNNING; controller / scheduler will
-                # change to READY when preempted or requeued
-                self.state = ThreadState.RUNNING
+        s = self.state
+        # if this thread is blocked or already finished, do nothing
+        if not s & SCHEDULABLE:
+            return 0
 
-            return to_run
+        r = self.remaining
+        to_run = r if r < quantum else quantum
+        r -= to_run
+        self.remaining = r
 
+        # TERMINATED when finished this tick; otherwise it stays RUNNING and
+        # the controller / scheduler changes it when preempted or requeued
+        self.state = TERMINATED if r <= 0 else RUNNING
+        return to_run
 
     def __repr__(self):
-        return f"<SimThread {self.name} id={self.id} state={self.state.name} rem={self.remaining} pr={self.priority}>"
+        return f"<SimThread {self.name} id={self.id} state={self.state_name} rem={self.remaining} pr={self.priority}>"
 
 
 
@@ -84,21 +111,27 @@ class SimThread:
 # -----------------------------
 
 class KernelThread:
+    """
+    A simulated core. Not internally locked: assign/release are only
+    called by the controller under _sched_lock, so a core is driven by
+    one tick at a time.
+    """
+
+    __slots__ = ("id", "current_thread")
+
     def __init__(self, kid: int):
         self.id = kid
         self.current_thread: Optional[SimThread] = None
-        self.lock = threading.Lock()
 
     def assign(self, thread: SimThread):
-        with self.lock:
-            self.current_thread = thread
-            thread.mapped_kernel = self.id
+        self.current_thread = thread
+        thread.mapped_kernel = self.id
 
     def release(self):
-        with self.lock:
-            if self.current_thread:
-                self.current_thread.mapped_kernel = None
-            self.current_thread = None
+        ct = self.current_thread
+        if ct is not None:
+            ct.mapped_kernel = None
+        self.current_thread = None
 
     def __repr__(self):
         return f"<KernelThread id={self.id} running={self.current_thread}>"
@@ -110,109 +143,263 @@ class KernelThread:
 # -----------------------------
 
 class SchedulerBase:
+    """
+    Ready-queue interface. Implementations are not internally locked:
+    callers serialize access (SimulationController holds _sched_lock
+    around every scheduler call).
+    """
+
+    __slots__ = ()
+
     def add(self, thread: SimThread):
         raise NotImplementedError()
 
     def remove(self, thread: SimThread):
         raise NotImplementedError()
 
-    def next(self) -> Optional[SimThread]:
+    def next(self, kid: Optional[int] = None) -> Optional[SimThread]:
+        """Pick the next thread for kernel `kid` (ignored unless sharded)."""
         raise NotImplementedError()
 
-    def peek_queue(self) -> List[SimThread]:
+    def _iter_live(self) -> Iterator[SimThread]:
+        """Yield the queued threads in dispatch order, skipping stale entries."""
         raise NotImplementedError()
 
+    # peek_queue/snapshot_into are a public read API for inspecting the
+    # ready queue; nothing in the simulator calls them on a hot path.
+    def peek_queue(self) -> List[SimThread]:
+        return list(self._iter_live())
+
+    def snapshot_into(self, out: list) -> list:
+        """Refill a caller-owned list with the live queue; avoids a new list per call."""
+        out.clear()
+        out.extend(self._iter_live())
+        return out
+
+
+
+# Lazy deletion leaves stale entries behind; once they outnumber the live
+# ones (plus some slack) the queue is rebuilt, keeping next() amortized O(1).
+_COMPACT_SLACK = 8
+
+
+def _needs_compaction(entries: int, live: int) -> bool:
+    return entries > 2 * live + _COMPACT_SLACK
 
 
 # ROUND ROBIN
 class RoundRobinScheduler(SchedulerBase):
+    """
+    FIFO ready queue with lazy deletion:
+    - queue holds (token, thread) entries, some of which may be stale
+    - _live maps thread id -> token of its one live entry
+    remove() just drops the id from _live; next() skips stale entries.
+    """
+
+    __slots__ = ("queue", "_live", "_tokens")
+
     def __init__(self):
         self.queue = deque()
-        self.lock = threading.Lock()
+        self._live = {}
+        self._tokens = itertools.count()
 
     def add(self, thread: SimThread):
-        with self.lock:
-            if thread.state != ThreadState.TERMINATED and thread not in self.queue:
-                thread.state = ThreadState.READY
-                self.queue.append(thread)
+        if thread.state & SCHEDULABLE and thread.id not in self._live:
+            thread.state = READY
+            tok = next(self._tokens)
+            self._live[thread.id] = tok
+            self.queue.append((tok, thread))
 
     def remove(self, thread: SimThread):
-        with self.lock:
-            try: self.queue.remove(thread)
-            except ValueError: pass
+        if self._live.pop(thread.id, None) is not None and \
+                _needs_compaction(len(self.queue), len(self._live)):
+            self.queue = deque(e for e in self.queue if self._live.get(e[1].id) == e[0])
+
+    def next(self, kid=None, _SCHEDULABLE=SCHEDULABLE):
+        # _SCHEDULABLE and the bound locals keep the loop on LOAD_FAST
+        queue, live = self.queue, self._live
+        while queue:
+            tok, t = queue.popleft()
+            if live.get(t.id) != tok:
+                continue  # removed while queued
+            del live[t.id]
+            if t.state & _SCHEDULABLE:
+                return t
+        return None
+
+    def _iter_live(self):
+        live = self._live
+        return (t for tok, t in self.queue if live.get(t.id) == tok)
+
+
+
+# SHARDED ROUND ROBIN
+class ShardedRRScheduler(SchedulerBase):
+    """
+    Round robin with one ready deque per kernel (shard).
+    - add() appends to the preferred shard (default: thread.id % shards)
+    - next(kid) pops from the kernel's own shard; when that is empty it
+      steals from the tail of another shard (work stealing)
+    Shards hold (token, thread) entries with the same lazy deletion as
+    RoundRobinScheduler.
+    """
 
-    def next(self):
-        with self.lock:
-            if not self.queue:
-                return None
-            t = self.queue.popleft()
-            return t if t.state != ThreadState.TERMINATED else self.next()
+    __slots__ = ("num_shards", "shards", "_live", "_tokens")
 
-    def peek_queue(self):
-        with self.lock:
-            return list(self.queue)
+    def __init__(self, num_shards: int):
+        self.num_shards = max(1, num_shards)
+        self.shards = [deque() for _ in range(self.num_shards)]
+        self._live = {}
+        self._tokens = itertools.count()
+
+    def add(self, thread: SimThread, prefer_shard: Optional[int] = None):
+        if thread.state & SCHEDULABLE and thread.id not in self._live:
+            thread.state = READY
+            idx = (thread.id if prefer_shard is None else prefer_shard) % self.num_shards
+            tok = next(self._tokens)
+            self._live[thread.id] = tok
+            self.shards[idx].append((tok, thread))
+
+    def remove(self, thread: SimThread):
+        if self._live.pop(thread.id, None) is not None and \
+                _needs_compaction(sum(map(len, self.shards)), len(self._live)):
+            live = self._live
+            self.shards = [deque(e for e in shard if live.get(e[1].id) == e[0])
+                           for shard in self.shards]
+
+    def _take(self, shard: deque, steal: bool, _SCHEDULABLE=SCHEDULABLE):
+        live = self._live
+        pop = shard.pop if steal else shard.popleft
+        while shard:
+            tok, t = pop()
+            if live.get(t.id) != tok:
+                continue  # removed while queued
+            del live[t.id]
+            if t.state & _SCHEDULABLE:
+                return t
+        return None
+
+    def next(self, kid=None):
+        own = (kid or 0) % self.num_shards
+        t = self._take(self.shards[own], steal=False)
+        if t is not None:
+            return t
+        for i in range(1, self.num_shards):
+            t = self._take(self.shards[(own + i) % self.num_shards], steal=True)
+            if t is not None:
+                return t
+        return None
+
+    def _iter_live(self):
+        live = self._live
+        return (t for shard in self.shards for tok, t in shard if live.get(t.id) == tok)
 
 
 
 # FCFS
 class FCFSScheduler(SchedulerBase):
+    """
+    Head of the queue runs until it terminates. Same (token, thread)
+    lazy deletion as RoundRobinScheduler, so add/remove are O(1).
+    """
+
+    __slots__ = ("queue", "_live", "_tokens")
+
     def __init__(self):
         self.queue = deque()
-        self.lock = threading.Lock()
+        self._live = {}
+        self._tokens = itertools.count()
 
     def add(self, thread: SimThread):
-        with self.lock:
-            if thread.state != ThreadState.TERMINATED and thread not in self.queue:
-                thread.state = ThreadState.READY
-                self.queue.append(thread)
+        if thread.state & SCHEDULABLE and thread.id not in self._live:
+            thread.state = READY
+            tok = next(self._tokens)
+            self._live[thread.id] = tok
+            self.queue.append((tok, thread))
 
     def remove(self, thread: SimThread):
-        with self.lock:
-            try: self.queue.remove(thread)
-            except ValueError: pass
-
-    def next(self):
-        with self.lock:
-            while self.queue:
-                t = self.queue[0]
-                if t.state == ThreadState.TERMINATED:
-                    self.queue.popleft()
-                    continue
-                return t
-            return None
-
-    def peek_queue(self):
-        with self.lock:
-            return list(self.queue)
+        if self._live.pop(thread.id, None) is not None and \
+                _needs_compaction(len(self.queue), len(self._live)):
+            self.queue = deque(e for e in self.queue if self._live.get(e[1].id) == e[0])
+
+    def next(self, kid=None, _SCHEDULABLE=SCHEDULABLE):
+        queue, live = self.queue, self._live
+        while queue:
+            tok, t = queue[0]
+            if live.get(t.id) != tok:
+                queue.popleft()  # removed while queued
+                continue
+            if not t.state & _SCHEDULABLE:
+                queue.popleft()
+                del live[t.id]
+                continue
+            return t
+        return None
+
+    def _iter_live(self):
+        live = self._live
+        return (t for tok, t in self.queue if live.get(t.id) == tok)
 
 
 
 # PRIORITY
+def _heap_key(entry):
+    # (-priority, id): the order heappop yields live entries in
+    return entry[0], entry[1]
+
+
 class PriorityScheduler(SchedulerBase):
+    """
+    Binary heap of (-priority, id, token, thread): highest priority first,
+    lowest id on ties. Uses the same lazy deletion as RoundRobinScheduler.
+    """
+
+    __slots__ = ("heap", "_live", "_tokens")
+
     def __init__(self):
-        self.lock = threading.Lock()
         self.heap = []
+        self._live = {}
+        self._tokens = itertools.count()
 
     def add(self, thread: SimThread):
-        with self.lock:
-            if thread.state != ThreadState.TERMINATED and thread not in self.heap:
-                thread.state = ThreadState.READY
-                self.heap.append(thread)
+        if thread.state & SCHEDULABLE and thread.id not in self._live:
+            thread.state = READY
+            tok = next(self._tokens)
+            self._live[thread.id] = tok
+            heapq.heappush(self.heap, (-thread.priority, thread.id, tok, thread))
 
     def remove(self, thread: SimThread):
-        with self.lock:
-            try: self.heap.remove(thread)
-            except ValueError: pass
-
-    def next(self):
-        with self.lock:
-            valid = [t for t in self.heap if t.state != ThreadState.TERMINATED]
-            if not valid:
-                return None
-            sel = max(valid, key=lambda t: (t.priority, -t.id))
-            self.heap.remove(sel)
-            return sel
-
-    def peek_queue(self):
-        with self.lock:
-            return list(self.heap)
+        if self._live.pop(thread.id, None) is not None and \
+                _needs_compaction(len(self.heap), len(self._live)):
+            self.heap = [e for e in self.heap if self._live.get(e[1]) == e[2]]
+            heapq.heapify(self.heap)
+
+    def next(self, kid=None, _SCHEDULABLE=SCHEDULABLE, _heappop=heapq.heappop):
+        heap, live = self.heap, self._live
+        while heap:
+            _, tid, tok, t = _heappop(heap)
+            if live.get(tid) != tok:
+                continue  # removed while queued
+            del live[tid]
+            if t.state & _SCHEDULABLE:
+                return t
+        return None
+
+    def _iter_live(self):
+        # Heap array order isn't dispatch order; sort the live entries
+        # by (-priority, id), the same key next() pops by
+        live = self._live
+        entries = sorted((e for e in self.heap if live.get(e[1]) == e[2]), key=_heap_key)
+        return (e[3] for e in entries)
+
+    def snapshot_into(self, out: list) -> list:
+        # Sort the live entries inside `out` and project them in place. Live
+        # (-priority, id) prefixes are unique, so a plain sort never compares
+        # past them and needs no key list (only sort's own scratch space).
+        live = self._live
+        out.clear()
+        out.extend(e for e in self.heap if live.get(e[1]) == e[2])
+        out.sort()
+        for i, e in enumerate(out):
+            out[i] = e[3]
+        return out
@@ -7,7 +7,7 @@ Synchronization primitives for the simulator:
 """
 
 import threading
-from collections import deque
+from collections import defaultdict, deque
 from typing import Deque, Optional
 
 
@@ -20,6 +20,7 @@ class SimSemaphore:
         self.value = initial
         self.lock = threading.Lock()
         self.blocked: Deque = deque()
+        self._blocked_ids: Deque[int] = deque()  # ids of self.blocked, same order
         self.name = name or f"sem_{id(self)}"
 
     def P(self, thread):
@@ -27,34 +28,35 @@ class SimSemaphore:
         WAIT operation (P):
         - If semaphore value > 0 → decrement and continue
         - Else → block thread (thread must be removed from scheduler externally)
+        value never goes below 0; waiters are counted by the blocked queue.
         Returns:
             True  -> acquired
             False -> thread blocked
         """
         with self.lock:
-            self.value -= 1
+            if self.value > 0:
+                self.value -= 1
+                return True
 
-            if self.value < 0:
-                # Need to block
-                self.blocked.append(thread)
-                return False
-
-            return True
+            # Need to block
+            self.blocked.append(thread)
+            self._blocked_ids.append(thread.id)
+            return False
 
     def V(self):
         """
         SIGNAL operation (V):
-        - Increment value
-        - If blocked threads exist → unblock one
+        - If blocked threads exist → hand the unit straight to one (value unchanged)
+        - Else → increment value
         Returns:
             The unblocked thread object, or None
         """
         with self.lock:
-            self.value += 1
-
             if self.blocked:
+                self._blocked_ids.popleft()
                 return self.blocked.popleft()
 
+            self.value += 1
             return None
 
     def peek_blocked(self):
@@ -62,6 +64,10 @@ class SimSemaphore:
         with self.lock:
             return list(self.blocked)
 
+    def peek_blocked_ids(self):
+        """Ids of blocked threads, FIFO order. Live view: do not mutate."""
+        return self._blocked_ids
+
 
 
 # -----------------------------
@@ -73,24 +79,20 @@ class Monitor:
     Simple simulated monitor wrapper.
     - Has 1 lock (not OS mutex, just a simulation lock)
     - Condition variables stored in a dictionary (name -> queue)
+    Safe to call from several threads: wait/signal are a single atomic
+    deque append/popleft, and broadcast drains with popleft calls.
     """
 
     def __init__(self):
         self.lock = threading.Lock()
-        self.conditions = {}  # name: deque of threads
-
-    def _queue(self, name):
-        """Return condition queue, create if needed"""
-        if name not in self.conditions:
-            self.conditions[name] = deque()
-        return self.conditions[name]
+        self.conditions = defaultdict(deque)  # name: deque of threads (created on first use)
 
     def wait(self, name: str, thread):
         """
         Put 'thread' into the condition queue.
         (Caller must set thread.state = BLOCKED outside.)
         """
-        q = self._queue(name)
+        q = self.conditions[name]
         q.append(thread)
 
     def signal(self, name: str):
@@ -98,21 +100,26 @@ class Monitor:
         Wake one waiting thread.
         Returns the thread to unblock, or None.
         """
-        q = self._queue(name)
-        if q:
-            return q.popleft()
-        return None
+        try:
+            return self.conditions[name].popleft()
+        except IndexError:
+            return None
 
     def broadcast(self, name: str):
         """
         Wake all waiting threads.
         Returns list of woken threads.
         """
-        q = self._queue(name)
-        lst = list(q)
-        q.clear()
-        return lst
+        q = self.conditions[name]
+        lst = []
+        # popleft one by one: a concurrent wait() can't be lost
+        # between copying and clearing the queue
+        while True:
+            try:
+                lst.append(q.popleft())
+            except IndexError:
+                return lst
 
     def peek(self, name: str):
         """Return list of waiting threads for visualization"""
-        return list(self._queue(name))
+        return list(self.conditions[name])
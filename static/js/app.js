@@ -1,5 +1,6 @@
 const API = {
   state: "/api/state",
+  stream: "/api/stream",
   start: "/api/start",
   pause: "/api/pause",
   step: "/api/step",
@@ -21,6 +22,7 @@ const API = {
 };
 
 let pollTimer = null;
+let stateStream = null;
 let lastTick = 0;
 
 // =======================================
@@ -323,11 +325,34 @@ async function pollState() {
   }
 }
 
+// One-off refresh after a user action (the stream may not push for a while)
+function refreshState() {
+  return pollState();
+}
+
 function startPolling() {
   if (pollTimer) clearInterval(pollTimer);
   pollTimer = setInterval(pollState, 500);
 }
 
+// Prefer server-pushed updates; fall back to polling if streaming fails
+function startStream() {
+  if (!window.EventSource) return startPolling();
+
+  stateStream = new EventSource(API.stream);
+  stateStream.onmessage = (e) => renderState(JSON.parse(e.data));
+  // Server ends each stream after a while; open a fresh one
+  stateStream.addEventListener("reconnect", () => {
+    stateStream.close();
+    startStream();
+  });
+  stateStream.onerror = () => {
+    stateStream.close();
+    stateStream = null;
+    startPolling();
+  };
+}
+
 
 // =======================================
 //              CONTROLS
@@ -415,5 +440,5 @@ window.addEventListener("DOMContentLoaded", async () => {
   } catch (err) {
     console.error("Failed to init demo", err);
   }
-  startPolling();
+  startStream();
 });
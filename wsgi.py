@@ -0,0 +1,9 @@
+# wsgi.py
+
+"""
+WSGI entry point for production servers:
+
+    gunicorn -c gunicorn_conf.py wsgi:app
+"""
+
+from src.app import app